@@ -8,38 +8,303 @@ General-purpose utility rate parser for arbitrary US ZIP codes using:
 """
 
 import argparse
+import hashlib
+import json
+import os
 import sys
+import numpy as np
 import pandas as pd
 from datetime import date
 from pathlib import Path
 
+# DuckDB and pyarrow are optional; without them the URDB CSV is streamed
+# through pandas in chunks
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pacsv = pq = None
+
+# numexpr is optional too; without it the row filter is evaluated in NumPy
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+# URDB columns used by the filters and the output (plus every
+# energyratestructure/*rate column)
+URDB_COLUMNS = [
+    "eiaid",
+    "sector",
+    "is_default",
+    "startdate",
+    "enddate",
+    "fixedchargefirstmeter",
+]
+
+# Same row filters as filter_residential_active_today (minus service_type,
+# which comes from the ZIP maps), applied inside the DuckDB scan. The date
+# check is separate because it only holds for the day the scan runs.
+RESIDENTIAL_SQL = "sector ILIKE '%residential%' AND TRY_CAST(is_default AS BOOLEAN)"
+
+ACTIVE_TODAY_SQL = (
+    "(TRY_CAST(startdate AS TIMESTAMP) IS NULL OR TRY_CAST(startdate AS TIMESTAMP) <= CAST(? AS DATE)) "
+    "AND (TRY_CAST(enddate AS TIMESTAMP) IS NULL OR TRY_CAST(enddate AS TIMESTAMP) >= CAST(? AS DATE))"
+)
+
+# ZIP map columns kept in the prebuilt ZIP index
+ZIP_INDEX_COLUMNS = ["eiaid", "utility_name", "state", "ownership", "service_type"]
+
+# Feather copies of parsed CSVs, keyed on path and modification time
+# An empty XDG_CACHE_HOME counts as unset, per the XDG base directory spec
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "urdb"
+
 def require_file(path):
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Required file not found: {path}")
     return path
 
-def load_zip_maps(iou_csv, non_iou_csv):
-    iou = pd.read_csv(iou_csv)
-    non_iou = pd.read_csv(non_iou_csv)
+def cached_frame(path, loader, cache_dir):
+    # Parse the file with loader() once and reuse a Feather copy until the
+    # file changes. Stale copies of the same file are removed.
+    path = Path(path).resolve()
+    key = "%s-%s" % (path.stem, hashlib.sha1(str(path).encode()).hexdigest()[:12])
+    cache_file = Path(cache_dir) / f"{key}-{path.stat().st_mtime_ns}.feather"
+
+    if cache_file.exists():
+        try:
+            return pd.read_feather(cache_file, use_threads=True)
+        except Exception:
+            # Unreadable copy (e.g. truncated); drop it and parse again
+            cache_file.unlink(missing_ok=True)
+
+    df = loader(path)
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    for stale in cache_file.parent.glob(f"{key}-*.feather"):
+        stale.unlink(missing_ok=True)
+
+    # Write to a temporary file and rename it into place, so no reader
+    # ever sees a partially written copy
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        df.to_feather(tmp_file)
+        os.replace(tmp_file, cache_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+
+    return df
+
+def load_zip_maps(iou_csv, non_iou_csv, cache_dir=None):
+    if cache_dir is not None:
+        iou = cached_frame(iou_csv, pd.read_csv, cache_dir)
+        non_iou = cached_frame(non_iou_csv, pd.read_csv, cache_dir)
+    else:
+        iou = pd.read_csv(iou_csv)
+        non_iou = pd.read_csv(non_iou_csv)
 
     zipmap = pd.concat([iou, non_iou], ignore_index=True)
 
     if "eiaid" not in zipmap.columns:
         raise ValueError("ZIP mapping files must contain 'eiaid' column")
 
-    zipmap["zip"] = zipmap["zip"].astype("int64")
-    zipmap["eiaid"] = zipmap["eiaid"].astype("int64")
+    return cast_zipmap(zipmap)
+
+def cast_zipmap(zipmap):
+    # ZIPs and eiaids fit comfortably in 32 bits; the text columns only
+    # have a few hundred distinct values
+    zipmap["zip"] = zipmap["zip"].astype("int32")
+    zipmap["eiaid"] = zipmap["eiaid"].astype("int32")
+    for col in ("utility_name", "service_type", "ownership"):
+        if col in zipmap.columns:
+            zipmap[col] = zipmap[col].astype("category")
 
     return zipmap
 
-def load_urdb(urdb_csv):
-    df = pd.read_csv(urdb_csv, low_memory=False)
+def build_zip_index(zipmap, index_json):
+    # One-time step: store each ZIP's utility rows so later queries can
+    # skip reading and concatenating the ZIP mapping CSVs.
+    rows = zipmap[ZIP_INDEX_COLUMNS].astype(object)
+    rows = rows.where(rows.notna(), None)
+
+    zips = {}
+    for zip_code, row in zip(zipmap["zip"].tolist(), rows.values.tolist()):
+        zips.setdefault(str(zip_code), []).append(row)
+
+    with open(index_json, "w") as f:
+        json.dump({"columns": ZIP_INDEX_COLUMNS, "zips": zips}, f)
+
+    return len(zips)
+
+def load_zip_index(index_json, zip_code):
+    # Returns the ZIP map rows for a single ZIP, shaped like load_zip_maps()
+    with open(index_json) as f:
+        index = json.load(f)
+
+    zip_code = int(zip_code)
+    zipmap = pd.DataFrame(index["zips"].get(str(zip_code), []), columns=index["columns"])
+    zipmap.insert(0, "zip", zip_code)
+
+    return cast_zipmap(zipmap)
+
+def zip_eiaids(zip_code, zipmap):
+    zip_code = int(zip_code)
+    return tuple(int(x) for x in zipmap.loc[zipmap["zip"] == zip_code, "eiaid"].unique())
+
+def is_rate_column(col):
+    return col.startswith("energyratestructure") and col.endswith("rate")
 
-    if "eiaid" not in df.columns:
+def urdb_columns(columns):
+    # Only a handful of the URDB's columns are used downstream
+    columns = list(columns)
+    if "eiaid" not in columns:
         raise ValueError("URDB file must contain 'eiaid' column")
+    return [c for c in columns if c in URDB_COLUMNS or is_rate_column(c)]
+
+def quote_ident(name):
+    return '"%s"' % name.replace('"', '""')
+
+def read_urdb_csv(urdb_csv, eiaids=None, residential=False, active_today=False):
+    # Let DuckDB scan the CSV and push the eiaid (and optionally the
+    # residential default and active-today) predicates into the scan, so
+    # only rows that can survive the filters downstream are materialized.
+    con = duckdb.connect()
+    try:
+        columns = con.execute(
+            "SELECT column_name FROM (DESCRIBE SELECT * FROM read_csv_auto(?, HEADER=TRUE))",
+            [str(urdb_csv)]
+        ).fetchall()
+        select = ", ".join(quote_ident(c) for c in urdb_columns(c[0] for c in columns))
+
+        where = []
+        params = [str(urdb_csv)]
+        if eiaids is not None:
+            where.append("eiaid IN (%s)" % (", ".join("?" for _ in eiaids) or "NULL"))
+            params += eiaids
+        if residential:
+            where.append(RESIDENTIAL_SQL)
+        if active_today:
+            today = date.today()
+            where.append(ACTIVE_TODAY_SQL)
+            params += [today, today]
+
+        sql = "SELECT %s FROM read_csv_auto(?, HEADER=TRUE, SAMPLE_SIZE=-1)" % select
+        if where:
+            sql += " WHERE " + " AND ".join("(%s)" % w for w in where)
+
+        return con.execute(sql, params).df()
+    finally:
+        con.close()
+
+def read_urdb_csv_chunked(urdb_csv, eiaids=None, chunksize=200_000):
+    # Filter each chunk as it is parsed so peak memory is one chunk plus
+    # the matching rows, not the whole URDB.
+    columns = urdb_columns(pd.read_csv(urdb_csv, nrows=0).columns)
+    dtypes = {c: "float64" for c in columns if is_rate_column(c)}
+    dtypes["eiaid"] = "int64"
+
+    parts = []
+    for chunk in pd.read_csv(
+        urdb_csv,
+        usecols=columns,
+        dtype=dtypes,
+        chunksize=chunksize,
+        low_memory=False
+    ):
+        if eiaids is not None:
+            chunk = chunk[chunk["eiaid"].isin(eiaids)]
+        parts.append(chunk)
+
+    if not parts:
+        return pd.DataFrame(columns=columns)
+
+    return pd.concat(parts, ignore_index=True)
+
+def read_urdb_csv_arrow(urdb_csv, eiaids=None):
+    # Multi-threaded Arrow CSV parse of just the needed columns. Every
+    # column gets an explicit type so nothing is inferred block by block;
+    # dates stay strings and are parsed downstream.
+    columns = urdb_columns(pd.read_csv(urdb_csv, nrows=0).columns)
+    types = {c: pa.float64() for c in columns if is_rate_column(c)}
+    types.update({
+        "eiaid": pa.int64(),
+        "is_default": pa.bool_(),
+        "fixedchargefirstmeter": pa.float64(),
+    })
+    types.update({c: pa.string() for c in columns if c not in types})
+
+    table = pacsv.read_csv(
+        urdb_csv,
+        read_options=pacsv.ReadOptions(block_size=8 << 20, use_threads=True),
+        convert_options=pacsv.ConvertOptions(include_columns=columns, column_types=types)
+    )
+    if eiaids is not None:
+        table = table.filter(pc.is_in(table["eiaid"], value_set=pa.array(eiaids, pa.int64())))
+
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+def read_urdb_parquet(urdb_parquet, eiaids=None):
+    if pq is None:
+        raise ImportError("pyarrow is required to read a Parquet URDB")
+
+    # Row groups whose eiaid statistics exclude the ZIP's utilities are
+    # skipped entirely, and only the needed columns are decoded.
+    columns = urdb_columns(pq.ParquetFile(urdb_parquet).schema_arrow.names)
+    table = pq.read_table(
+        urdb_parquet,
+        columns=columns,
+        filters=None if eiaids is None else [("eiaid", "in", list(eiaids))]
+    )
+    return table.to_pandas(self_destruct=True)
 
-    df["eiaid"] = df["eiaid"].astype("int64")
+def convert_urdb(urdb_csv, urdb_parquet, row_group_size=65536):
+    # One-time conversion so later runs can skip CSV parsing and read only
+    # the row groups and columns they need.
+    if duckdb is None:
+        raise ImportError("duckdb is required to convert the URDB to Parquet")
+
+    con = duckdb.connect()
+    try:
+        return con.execute(
+            "COPY (SELECT * FROM read_csv_auto(?, HEADER=TRUE, SAMPLE_SIZE=-1)) "
+            "TO '%s' (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE %d)"
+            % (str(urdb_parquet).replace("'", "''"), row_group_size),
+            [str(urdb_csv)]
+        ).fetchone()[0]
+    finally:
+        con.close()
+
+def read_urdb(urdb_csv, eiaids=None, residential=False, active_today=False):
+    # residential and active_today let the DuckDB scan drop tariffs that
+    # filter_residential_active_today would drop anyway; the other readers
+    # ignore them.
+    if duckdb is not None:
+        return read_urdb_csv(urdb_csv, eiaids, residential, active_today)
+    if pa is not None:
+        return read_urdb_csv_arrow(urdb_csv, eiaids)
+    return read_urdb_csv_chunked(urdb_csv, eiaids)
+
+def load_urdb(urdb_path, eiaids=None, cache_dir=None, residential=False, active_today=False):
+    if Path(urdb_path).suffix == ".parquet":
+        df = read_urdb_parquet(urdb_path, eiaids)
+    elif cache_dir is not None:
+        # The cached copy holds every utility so it can serve any ZIP
+        df = cached_frame(urdb_path, read_urdb, cache_dir)
+        if eiaids is not None:
+            df = df[df["eiaid"].isin(eiaids)]
+    else:
+        df = read_urdb(urdb_path, eiaids, residential, active_today)
+
+    df["eiaid"] = df["eiaid"].astype("int32")
+    df["sector"] = df["sector"].astype("category")
 
     df = df.rename(columns={
         "fixedchargefirstmeter": "fixed_charge_in_dollars",
@@ -47,7 +312,13 @@ def load_urdb(urdb_csv):
         "enddate": "end_date",
     })
 
-    return df
+    # Remember each tariff's position in the URDB so results can be put
+    # back in file order
+    df["urdb_row"] = np.arange(len(df))
+
+    # Index and sort by eiaid so ZIP lookups are binary searches rather
+    # than scans
+    return df.set_index("eiaid").sort_index(kind="stable")
 
 def filter_by_zip(zip_code, zipmap, urdb):
     zip_code = int(zip_code)
@@ -57,69 +328,159 @@ def filter_by_zip(zip_code, zipmap, urdb):
     if utilities.empty:
         raise ValueError(f"No utilities found for ZIP code {zip_code}")
 
-    zip_eiaids = utilities["eiaid"].unique()
-    df_zip = urdb[urdb["eiaid"].isin(zip_eiaids)]
+    util_meta = utilities.set_index("eiaid")[["utility_name", "state", "ownership", "service_type"]]
 
-    df_zip = df_zip.merge(
-        utilities[["eiaid", "utility_name", "state", "ownership", "service_type"]],
-        on="eiaid",
-        how="left"
-    )
+    # Accept a frame with eiaid as a plain column, as read_urdb returns it
+    if "eiaid" in urdb.columns:
+        urdb = urdb.set_index("eiaid")
+    elif urdb.index.name != "eiaid":
+        raise ValueError("URDB frame must have an 'eiaid' column or index")
 
-    return df_zip
+    # Once urdb is sorted by eiaid (load_urdb already does this), each
+    # utility's tariffs are one contiguous run that binary search can
+    # locate without scanning the index
+    if not urdb.index.is_monotonic_increasing:
+        urdb = urdb.sort_index(kind="stable")
 
-def filter_residential_active_today(df):
-    df2 = df.copy()
+    keys = urdb.index.to_numpy()
+    eiaids = np.unique(util_meta.index.to_numpy())
+    lo = np.searchsorted(keys, eiaids, "left")
+    hi = np.searchsorted(keys, eiaids, "right")
+    rows = np.concatenate([np.arange(l, h) for l, h in zip(lo, hi)] + [np.empty(0, dtype=np.intp)])
 
-    # Convert dates to standard format
-    df2["start_date"] = pd.to_datetime(df2["start_date"], errors="coerce")
-    df2["end_date"] = pd.to_datetime(df2["end_date"], errors="coerce")
+    df_zip = urdb.iloc[rows].join(util_meta, how="left")
 
-    # Residential only
-    df2 = df2.query("sector.str.contains('residential', case=False, na=False)")
+    # Restore URDB file order, which the eiaid sort gave up
+    if "urdb_row" in df_zip.columns:
+        df_zip = df_zip.sort_values("urdb_row", kind="stable").drop(columns="urdb_row")
 
-    # Use only Delivery rates
-    df2 = df2.query("service_type == 'Delivery'")
+    return df_zip.reset_index()
 
-    # Use only default rates
-    df2 = df2.query("is_default == True")
+def filter_residential_active_today(df):
+    # Residential only, matched once per sector category rather than per row
+    sector = df["sector"].astype("category")
+    is_res = sector.cat.categories.astype(str).str.contains("residential", case=False)
+    mask = np.append(is_res, False)[sector.cat.codes.to_numpy()]
 
-    # Check for plans that are active today
-    today = pd.Timestamp(date.today())
+    # Use only Delivery rates
+    mask &= df["service_type"].eq("Delivery").to_numpy(dtype=bool, na_value=False)
 
-    df2 = df2.query(
-        "(start_date.isna() or start_date <= @today) and "
-        "(end_date.isna() or end_date >= @today)"
+    # Use only default rates
+    mask &= df["is_default"].eq(True).to_numpy(dtype=bool, na_value=False)
+
+    rows = np.flatnonzero(mask)
+
+    # Convert dates to standard format, only for the rows still in play.
+    # URDB dates are ISO 8601 (with or without a time), so skip per-row
+    # format inference.
+    start_date = pd.to_datetime(df["start_date"].iloc[rows], errors="coerce", format="ISO8601")
+    end_date = pd.to_datetime(df["end_date"].iloc[rows], errors="coerce", format="ISO8601")
+
+    # Check for plans that are active today. numexpr has no datetime type,
+    # so compare the dates as int64 seconds, where NaT is the int64 minimum.
+    today = np.datetime64(date.today(), "s").astype(np.int64)
+    nat = np.iinfo(np.int64).min
+    start = start_date.to_numpy(dtype="datetime64[s]").view(np.int64)
+    end = end_date.to_numpy(dtype="datetime64[s]").view(np.int64)
+
+    if ne is not None:
+        active = ne.evaluate(
+            "((start == nat) | (start <= today)) & ((end == nat) | (end >= today))",
+            local_dict={"start": start, "end": end, "nat": nat, "today": today}
+        )
+    else:
+        active = ((start == nat) | (start <= today)) & ((end == nat) | (end >= today))
+
+    # Row selection already returns a new frame, so there is no need to
+    # copy the input before replacing the date columns
+    return df.iloc[rows[active]].assign(
+        start_date=start_date.to_numpy()[active],
+        end_date=end_date.to_numpy()[active]
     )
 
-    return df2
-
-def extract_flat_energy_rate(row):
-    for col in row.index:
-        if col.startswith("energyratestructure") and col.endswith("rate"):
-            val = row[col]
-            if pd.notna(val) and val > 0:
-                return float(val)
-    return None
+def rate_block(df):
+    # All energyratestructure/*rate columns as one (rows x tiers) float64
+    # array in cents per kWh, with non-positive rates masked to NaN
+    rate_cols = [c for c in df.columns if is_rate_column(c)]
+    # copy=True gives an array we own (never a read-only view of df), so it
+    # can be scaled and masked in place without a second allocation
+    rates = df[rate_cols].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    rates *= 100.0
+    rates[~(rates > 0)] = np.nan
+    return rates
+
+def extract_flat_energy_rate(rates):
+    if rates.shape[1] == 0:
+        return np.full(len(rates), np.nan)
+
+    # First positive rate in column order (NaN if there is none)
+    first = np.argmax(~np.isnan(rates), axis=1)
+    return rates[np.arange(len(rates)), first]
 
 def add_cents_per_kwh(df):
-    rates = df.apply(extract_flat_energy_rate, axis=1)
-    df["var_charge_in_cents_per_kwh"] = (rates * 100).round(2)
+    cents = extract_flat_energy_rate(rate_block(df))
+    df["var_charge_in_cents_per_kwh"] = np.round(cents, 2)
     return df
 
+def residential_rates(zip_code, zipmap, urdb):
+    df_zip = filter_by_zip(zip_code, zipmap, urdb)
+    df_res = filter_residential_active_today(df_zip)
+    df_res = add_cents_per_kwh(df_res)
+
+    cols_out = [
+        "utility_name",
+        "start_date",
+        "end_date",
+        "var_charge_in_cents_per_kwh",
+        "fixed_charge_in_dollars"
+    ]
+
+    return df_res[[c for c in cols_out if c in df_res.columns]]
+
+def print_rates(zip_code, df_res):
+    # Pretty-print to terminal
+    pd.set_option("display.max_rows", None)
+    pd.set_option("display.max_columns", None)
+    pd.set_option("display.width", 160)
+    pd.set_option("display.colheader_justify", "left")
+
+    print("\nResidential default utility rates for ZIP code %s:\n" % (zip_code))
+    print(df_res.to_string(index=False))
+
+def serve(zipmap, urdb, lines):
+    # Answer one ZIP code per input line against the already loaded data;
+    # a bad ZIP is reported without stopping the loop
+    for line in lines:
+        zip_code = line.strip()
+        if not zip_code:
+            continue
+
+        try:
+            print_rates(zip_code, residential_rates(zip_code, zipmap, urdb))
+        except Exception as e:
+            print(f"ERROR: {e}")
+
+        sys.stdout.flush()
+
 def main():
     parser = argparse.ArgumentParser(description="Parse residential utility rates for any US ZIP code.")
 
     parser.add_argument(
         "-z", "--zip",
-        required=True,
+        default=None,
         help="Target ZIP code (5-digit)"
     )
 
     parser.add_argument(
         "-u", "--urdb",
         default="usurdb.csv",
-        help="Path to URDB CSV (default: usurdb.csv)"
+        help="Path to URDB CSV or Parquet file (default: usurdb.csv)"
+    )
+
+    parser.add_argument(
+        "--convert",
+        action="store_true",
+        help="Convert the URDB CSV to Parquet (next to the CSV) and exit"
     )
 
     parser.add_argument(
@@ -135,48 +496,96 @@ def main():
         help="Non-IOU ZIP mapping CSV"
     )
 
+    parser.add_argument(
+        "--zip-index",
+        dest="zip_index",
+        default=None,
+        help="Prebuilt ZIP index JSON to use instead of the ZIP mapping CSVs"
+    )
+
+    parser.add_argument(
+        "--build-zip-index",
+        dest="build_zip_index",
+        action="store_true",
+        help="Build the ZIP index (default: zip_index.json) from the ZIP mapping CSVs and exit"
+    )
+
     parser.add_argument(
         "-o", "--out",
         default=None,
         help="Optional output CSV filename"
     )
 
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Load the data once, then read ZIP codes from stdin (one per line)"
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=f"Cache parsed CSVs as Feather files in {CACHE_DIR}"
+    )
+
     args = parser.parse_args()
 
-    try:
-        urdb_path = require_file(args.urdb)
-        urdb = load_urdb(urdb_path)
+    if not (args.convert or args.build_zip_index or args.serve) and args.zip is None:
+        parser.error("the following arguments are required: -z/--zip")
 
-        iou_path = require_file(args.iou)
-        non_iou_path = require_file(args.non_iou)
-        zipmap = load_zip_maps(iou_path, non_iou_path)
+    if args.serve and args.zip_index:
+        parser.error("--serve reads the ZIP mapping CSVs; --zip-index is not supported")
+    if args.serve and (args.zip is not None or args.out):
+        parser.error("--serve reads ZIP codes from stdin and prints to stdout; -z/--zip and -o/--out are not supported")
 
-        df_zip = filter_by_zip(args.zip, zipmap, urdb)
-        df_res = filter_residential_active_today(df_zip)
-        df_res = add_cents_per_kwh(df_res)
+    try:
+        if args.convert:
+            urdb_path = require_file(args.urdb)
+            parquet_path = urdb_path.with_suffix(".parquet")
+            n = convert_urdb(urdb_path, parquet_path)
+            print(f"Wrote {n} rows to {parquet_path}")
+            return
+
+        if args.build_zip_index:
+            index_path = args.zip_index or "zip_index.json"
+            zipmap = load_zip_maps(require_file(args.iou), require_file(args.non_iou))
+            n = build_zip_index(zipmap, index_path)
+            print(f"Wrote {n} ZIP codes to {index_path}")
+            return
+
+        urdb_path = require_file(args.urdb)
+        cache_dir = CACHE_DIR if args.cache else None
+
+        if args.serve:
+            zipmap = load_zip_maps(require_file(args.iou), require_file(args.non_iou), cache_dir)
+            # Leave the date check to each query; a long-running process
+            # must pick up tariffs that become active after it starts
+            urdb = load_urdb(urdb_path, None, cache_dir, residential=True)
+            serve(zipmap, urdb, sys.stdin)
+            return
+
+        if args.zip_index:
+            zipmap = load_zip_index(require_file(args.zip_index), args.zip)
+        else:
+            iou_path = require_file(args.iou)
+            non_iou_path = require_file(args.non_iou)
+            zipmap = load_zip_maps(iou_path, non_iou_path, cache_dir)
 
-        cols_out = [
-            "utility_name",
-            "start_date",
-            "end_date",
-            "var_charge_in_cents_per_kwh",
-            "fixed_charge_in_dollars"
-        ]
+        urdb = load_urdb(
+            urdb_path,
+            zip_eiaids(args.zip, zipmap),
+            cache_dir,
+            residential=True,
+            active_today=True
+        )
 
-        df_res = df_res[[c for c in cols_out if c in df_res.columns]]
+        df_res = residential_rates(args.zip, zipmap, urdb)
 
         if args.out:
             df_res.to_csv(args.out, index=False)
             print(f"Wrote {len(df_res)} rows to {args.out}")
         else:
-            # Pretty-print to terminal
-            pd.set_option("display.max_rows", None)
-            pd.set_option("display.max_columns", None)
-            pd.set_option("display.width", 160)
-            pd.set_option("display.colheader_justify", "left")
-
-            print("\nResidential default utility rates for ZIP code %s:\n" % (args.zip))
-            print(df_res.to_string(index=False))
+            print_rates(args.zip, df_res)
 
     except Exception as e:
         print(f"ERROR: {e}")